@@ -21,11 +21,41 @@ Usage:
 import asyncio
 import argparse
 import csv
+import io
 import json
 import os
-from datetime import datetime
+import pickle
+import heapq
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from telethon import TelegramClient
-from telethon.tl.types import MessageMediaDocument, DocumentAttributeFilename
+from telethon.network import ConnectionTcpAbridged
+from telethon.tl.functions.messages import SearchRequest
+from telethon.tl.types import (
+    Channel, MessageMediaDocument, DocumentAttributeFilename, InputMessagesFilterDocument,
+    InputPeerChannel, PeerUser)
+
+# Prefer a C-accelerated JSON encoder for the export hot path.
+try:
+    import orjson
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj).decode('utf-8')
+except ImportError:
+    try:
+        import ujson
+
+        def _json_dumps(obj):
+            return ujson.dumps(obj, ensure_ascii=False)
+    except ImportError:
+        def _json_dumps(obj):
+            return json.dumps(obj, ensure_ascii=False)
+
+# Optional: zstd-compressed output (--compress / *.zst paths).
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
 
 # Try to import config, use defaults if not found
 try:
@@ -37,15 +67,60 @@ except ImportError:
     PHONE_NUMBER = None
 
 
+# Number of concurrent message-id shards scanned per group.
+NUM_SHARDS = 8
+
+# Disk cache of resolved group identifiers, reused across runs so warm
+# scrapes skip the get_entity round trip.
+ENTITY_CACHE_PATH = os.path.expanduser('~/.cache/tg-scraper/entities.pickle')
+
+# Cached type refs: `x.__class__ is _FILENAME_ATTR` is a pointer compare,
+# noticeably cheaper than isinstance() in the per-message hot loop.
+_FILENAME_ATTR = DocumentAttributeFilename
+_MEDIA_DOC = MessageMediaDocument
+
+# Document mime types that never carry a user filename (stickers).
+_STICKER_MIMES = frozenset({'image/webp', 'application/x-tgsticker'})
+
+# Output column order; rows are built as tuples in this order so csv.writer
+# can emit them without DictWriter's per-row key shuffling.
+FIELDNAMES = ('filename', 'message_id', 'date', 'sender', 'caption', 'file_size_mb', 'message_url')
+
+FileRow = namedtuple('FileRow', FIELDNAMES)
+
+# Default: all common file types
+DEFAULT_FILE_TYPES = [
+    '.ex4', '.ex5', '.mq4', '.mq5',  # MT4/MT5 EAs
+    '.zip', '.rar', '.7z',  # Archives
+    '.pdf', '.doc', '.docx', '.txt',  # Documents
+    '.jpg', '.jpeg', '.png', '.gif',  # Images
+    '.mp4', '.avi', '.mkv',  # Videos
+    '.py', '.js', '.html',  # Code
+]
+
+
 class TelegramFileScraper:
     """Scrape files from Telegram groups."""
     
-    def __init__(self, session_name='scraper_session'):
+    def __init__(self, session_name='scraper_session', output_path='scraped_files.csv', json_path=None):
         if not API_ID or not API_HASH:
             raise ValueError("API credentials not configured. Check config.py")
-        
-        self.client = TelegramClient(session_name, API_ID, API_HASH)
-        self.files = []
+
+        # Abridged has the lowest per-packet overhead of the MTProto transports.
+        self.client = TelegramClient(session_name, API_ID, API_HASH,
+                                     connection=ConnectionTcpAbridged)
+        self.output_path = output_path
+        self.json_path = json_path
+        # Rows stream to disk as they arrive; only O(1)+top-K summary
+        # stats are kept in memory.
+        self._reset_summary()
+        self._compile_ext_filter()
+        # sender_id -> display name; groups are dominated by repeat posters,
+        # so this stays tiny while skipping the hasattr probing per message.
+        self._sender_cache = {}
+        # identifier -> (peer_id, access_hash, title), persisted on close.
+        self._entity_cache = self._load_entity_cache()
+        self._entity_cache_dirty = False
         
     async def connect(self):
         """Connect to Telegram."""
@@ -59,25 +134,117 @@ class TelegramFileScraper:
         else:
             print("✅ Connected!")
     
-    def is_target_file(self, filename, file_types=None):
+    @staticmethod
+    def _load_entity_cache():
+        """Load the identifier -> peer cache, or start empty."""
+        try:
+            with open(ENTITY_CACHE_PATH, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return {}
+
+    def _save_entity_cache(self):
+        """Persist newly resolved peers for the next run."""
+        if not self._entity_cache_dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(ENTITY_CACHE_PATH), exist_ok=True)
+            with open(ENTITY_CACHE_PATH, 'wb') as f:
+                pickle.dump(self._entity_cache, f)
+        except OSError:
+            pass
+
+    async def _resolve_entity(self, group_identifier):
+        """Resolve a group to (input peer, title), skipping the RPC when cached."""
+        key = str(group_identifier)
+        cached = self._entity_cache.get(key)
+        if cached:
+            peer_id, access_hash, title = cached
+            return InputPeerChannel(peer_id, access_hash), title
+
+        entity = await self.client.get_entity(group_identifier)
+        title = getattr(entity, 'title', key)
+        # Only channels/supergroups have a stable (id, access_hash) pair
+        # we can rebuild an input peer from without re-resolving.
+        if isinstance(entity, Channel):
+            self._entity_cache[key] = (entity.id, entity.access_hash, title)
+            self._entity_cache_dirty = True
+        return entity, title
+
+    def _reset_summary(self):
+        """Clear the streaming summary stats for a fresh scrape."""
+        self._total_files = 0
+        self._total_size = 0.0
+        self._ext_counts = Counter()
+        # Min-heap of the 10 largest (size, filename) pairs seen so far.
+        self._largest = []
+
+    def _update_summary(self, batch):
+        """Fold a batch of rows into the streaming summary stats."""
+        largest = self._largest
+        for row in batch:
+            self._ext_counts[os.path.splitext(row.filename)[1].lower()] += 1
+            self._total_size += row.file_size_mb
+            item = (row.file_size_mb, row.filename)
+            if len(largest) < 10:
+                heapq.heappush(largest, item)
+            elif item > largest[0]:
+                heapq.heapreplace(largest, item)
+        self._total_files += len(batch)
+
+    def _compile_ext_filter(self, file_types=None):
+        """Normalize the extension list into a frozenset for O(1) lookups."""
+        if file_types is None:
+            file_types = DEFAULT_FILE_TYPES
+
+        self._ext_set = frozenset('.' + ext.lstrip('.').lower() for ext in file_types)
+
+    def is_target_file(self, filename):
         """Check if file matches target types."""
         if not filename:
             return False
-        
-        if file_types is None:
-            # Default: all common file types
-            file_types = [
-                '.ex4', '.ex5', '.mq4', '.mq5',  # MT4/MT5 EAs
-                '.zip', '.rar', '.7z',  # Archives
-                '.pdf', '.doc', '.docx', '.txt',  # Documents
-                '.jpg', '.jpeg', '.png', '.gif',  # Images
-                '.mp4', '.avi', '.mkv',  # Videos
-                '.py', '.js', '.html',  # Code
-            ]
-        
-        filename_lower = filename.lower()
-        return any(filename_lower.endswith(ext) for ext in file_types)
+
+        i = filename.rfind('.')
+        # Lowercase only the suffix -- the full filename never needs copying.
+        return i >= 0 and filename[i:].lower() in self._ext_set
     
+    async def scrape_groups(self, group_identifiers, limit=10000, file_types=None):
+        """Scrape several groups one after another on the same connection.
+
+        Reusing the already-connected client skips the DC handshake and
+        initConnection cost that a fresh process would pay per group.
+        """
+        base_output = self.output_path
+        base_json = self.json_path
+        multiple = len(group_identifiers) > 1
+
+        for group_identifier in group_identifiers:
+            if multiple:
+                slug = self._group_slug(group_identifier)
+                self.output_path = self._per_group_path(base_output, slug)
+                self.json_path = self._per_group_path(base_json, slug) if base_json else None
+
+            await self.scrape_group(group_identifier, limit, file_types)
+            self.print_summary()
+
+        self.output_path = base_output
+        self.json_path = base_json
+
+    @staticmethod
+    def _group_slug(group_identifier):
+        """Turn a group username/URL/id into a filename-safe slug."""
+        tail = str(group_identifier).rstrip('/').rsplit('/', 1)[-1]
+        return ''.join(c if c.isalnum() else '_' for c in tail)
+
+    @staticmethod
+    def _per_group_path(path, slug):
+        """Insert the group slug before the output extension(s)."""
+        root, ext = os.path.splitext(path)
+        if ext == '.zst':
+            root, inner = os.path.splitext(root)
+            ext = inner + ext
+        return f'{root}_{slug}{ext}'
+
     async def scrape_group(self, group_identifier, limit=10000, file_types=None):
         """
         Scrape files from a Telegram group.
@@ -91,123 +258,284 @@ class TelegramFileScraper:
         print(f"📊 Scanning last {limit} messages...\n")
         
         try:
-            entity = await self.client.get_entity(group_identifier)
-            group_title = entity.title
+            entity, group_title = await self._resolve_entity(group_identifier)
             print(f"📢 Group: {group_title}")
         except Exception as e:
             print(f"❌ Error getting group: {e}")
             return
         
+        self._reset_summary()
+        self._compile_ext_filter(file_types)
+
+        # Stream rows to disk as they are found instead of buffering them all
+        # in memory -- large scrapes keep RSS flat and produce output immediately.
+        # A 1 MiB BufferedWriter under the text layer coalesces the thousands of
+        # small writerow() chunks into few syscalls.
+        csv_file = self._open_output(self.output_path)
+        writer = csv.writer(csv_file)
+        writer.writerow(FIELDNAMES)
+
+        json_file = None
+        if self.json_path:
+            json_file = self._open_output(self.json_path)
+
+        try:
+            latest = await self.client.get_messages(entity, limit=1)
+            max_id = latest[0].id if latest else 0
+
+            # The message-URL base is loop-invariant; build it once here
+            # instead of re-checking the identifier for every matched row.
+            if isinstance(group_identifier, str) and not group_identifier.startswith('http'):
+                url_prefix = f'https://t.me/{group_identifier}/'
+            else:
+                url_prefix = None
+
+            if max_id:
+                # Split the message-id range into shards scanned concurrently;
+                # a single consumer drains the queue so only one task touches
+                # the output files.
+                queue = asyncio.Queue(maxsize=1024)
+                consumer = asyncio.ensure_future(self._write_rows(queue, writer, json_file))
+
+                shard_size = -(-max_id // NUM_SHARDS)  # ceil division
+                shard_limit = max(1, -(-limit // NUM_SHARDS))
+                shards = []
+                for low in range(0, max_id, shard_size):
+                    high = min(low + shard_size, max_id)
+                    shards.append(self._scan_shard(
+                        entity, url_prefix, queue,
+                        shard_limit, offset_id=high + 1, min_id=low))
+
+                try:
+                    await asyncio.gather(*shards)
+                finally:
+                    await queue.put(None)
+                    await consumer
+        finally:
+            csv_file.close()
+            if json_file:
+                json_file.close()
+
+        print(f"\n✅ Found {self._total_files} files")
+        print(f"📊 Exported to: {os.path.abspath(self.output_path)}")
+        if self.json_path:
+            print(f"📊 Exported to: {os.path.abspath(self.json_path)}")
+
+    @staticmethod
+    def _open_output(path):
+        """Open a text output file over a large binary write buffer.
+
+        Paths ending in .zst are compressed on the fly with zstd level 3,
+        which keeps up with the CSV writer on modern CPUs.
+        """
+        raw = open(path, 'wb', buffering=1024 * 1024)
+        if path.endswith('.zst'):
+            if zstd is None:
+                raw.close()
+                raise ValueError("zstandard is required for .zst output. pip install zstandard")
+            raw = zstd.ZstdCompressor(level=3).stream_writer(raw)
+        return io.TextIOWrapper(raw, encoding='utf-8', newline='', write_through=False)
+
+    async def _write_rows(self, queue, writer, json_file):
+        """Consume matched rows from the queue and stream them to disk.
+
+        Rows are drained in batches; the CSV and JSONL writes for a batch
+        run on a two-thread pool so the independent files overlap their
+        I/O (CPython releases the GIL during write) and blocking writes
+        stay off the event loop.
+        """
         count = 0
-        
-        async for message in self.client.iter_messages(entity, limit=limit):
-            # Check for document attachments
-            if message.media and isinstance(message.media, MessageMediaDocument):
-                doc = message.media.document
-                filename = None
-                
-                # Get filename from attributes
-                for attr in doc.attributes:
-                    if isinstance(attr, DocumentAttributeFilename):
-                        filename = attr.file_name
+        last_report = 0
+        loop = asyncio.get_running_loop()
+        done = False
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            while not done:
+                row = await queue.get()
+                if row is None:
+                    break
+
+                batch = [row]
+                while True:
+                    try:
+                        row = queue.get_nowait()
+                    except asyncio.QueueEmpty:
                         break
-                
-                # If no filename, try from document
-                if not filename and hasattr(doc, 'name'):
-                    filename = doc.name
-                
-                if filename and self.is_target_file(filename, file_types):
-                    file_info = {
-                        'filename': filename,
-                        'message_id': message.id,
-                        'date': message.date.strftime('%Y-%m-%d %H:%M:%S') if message.date else '',
-                        'sender': self._get_sender_name(message),
-                        'caption': (message.text or '')[:500],
-                        'file_size_mb': round(doc.size / (1024 * 1024), 2) if doc.size else 0,
-                        'message_url': f'https://t.me/{group_identifier}/{message.id}' if isinstance(group_identifier, str) and not group_identifier.startswith('http') else str(message.id)
-                    }
-                    self.files.append(file_info)
-                    count += 1
-                    print(f"  📄 [{count}] {filename} ({file_info['file_size_mb']} MB)")
-        
-        print(f"\n✅ Found {count} files")
-    
-    def _get_sender_name(self, message):
-        """Extract sender name from message."""
-        if not message.sender:
+                    if row is None:
+                        done = True
+                        break
+                    batch.append(row)
+
+                jobs = [loop.run_in_executor(pool, writer.writerows, batch)]
+                if json_file:
+                    jobs.append(loop.run_in_executor(pool, self._write_jsonl, json_file, batch))
+                await asyncio.gather(*jobs)
+
+                self._update_summary(batch)
+                count += len(batch)
+                # Printing every file serializes the event loop on terminal I/O;
+                # report progress in batches instead.
+                if count - last_report >= 100:
+                    print(f"  📄 ... {count} files found")
+                    last_report = count
+
+    @staticmethod
+    def _write_jsonl(json_file, batch):
+        """Write a batch of rows as JSON Lines (one object per line)."""
+        json_file.write(''.join(_json_dumps(row._asdict()) + '\n' for row in batch))
+
+    async def _scan_shard(self, entity, url_prefix, queue, shard_limit, offset_id, min_id):
+        """Scan one message-id shard and push matched rows onto the queue.
+
+        Pages through the raw messages.getHistory API instead of
+        iter_messages -- the raw TL structs already carry everything we
+        export, so this skips one high-level wrapper object per message.
+        """
+        remaining = shard_limit
+        pending = asyncio.ensure_future(
+            self._fetch_history(entity, offset_id, min_id, min(remaining, 100)))
+
+        while pending is not None:
+            result = await pending
+            messages = result.messages
+            if not messages:
+                break
+
+            remaining -= len(messages)
+            offset_id = messages[-1].id
+
+            # Issue the next page before filtering this one so the network
+            # round trip overlaps with local processing and writes.
+            if remaining > 0 and offset_id > min_id + 1:
+                pending = asyncio.ensure_future(
+                    self._fetch_history(entity, offset_id, min_id, min(remaining, 100)))
+            else:
+                pending = None
+
+            # Map the users bundled with this page for sender names.
+            users = {u.id: u for u in result.users}
+
+            for message in messages:
+                row = self._match_message(message, url_prefix, users)
+                if row is not None:
+                    await queue.put(row)
+
+    def _fetch_history(self, entity, offset_id, min_id, limit):
+        """Issue one document-filtered history page request (awaitable).
+
+        messages.search with InputMessagesFilterDocument drops text-only
+        messages server-side, so pages arrive pre-filtered and far fewer
+        bytes cross the wire and the TL decoder.
+        """
+        return self.client(SearchRequest(
+            peer=entity,
+            q='',
+            filter=InputMessagesFilterDocument(),
+            min_date=None,
+            max_date=None,
+            offset_id=offset_id,
+            add_offset=0,
+            limit=limit,
+            max_id=0,
+            min_id=min_id,
+            hash=0,
+        ))
+
+    def _match_message(self, message, url_prefix, users):
+        """Filter one raw message; return a FileRow if it matches, else None."""
+        media = getattr(message, 'media', None)
+        # Check for document attachments; most messages have none, so bail
+        # out with a single pointer compare instead of an isinstance call.
+        if media is None or media.__class__ is not _MEDIA_DOC:
+            return None
+
+        doc = media.document
+
+        # Stickers never have a filename; skip the attribute walk.
+        if doc.mime_type in _STICKER_MIMES:
+            return None
+
+        # Get filename from attributes
+        filename = next(
+            (a.file_name for a in doc.attributes if a.__class__ is _FILENAME_ATTR), None)
+
+        # If no filename, try from document
+        if not filename and hasattr(doc, 'name'):
+            filename = doc.name
+
+        if not self.is_target_file(filename):
+            return None
+
+        # f-string with fixed-width ints skips strftime's
+        # format-string parsing on every row.
+        d = message.date
+        date_str = (f'{d.year:04d}-{d.month:02d}-{d.day:02d} '
+                    f'{d.hour:02d}:{d.minute:02d}:{d.second:02d}') if d else ''
+        # Build the tuple directly in FIELDNAMES order -- no intermediate dict.
+        return FileRow(
+            filename,
+            message.id,
+            date_str,
+            self._get_sender_name(message, users),
+            (message.message or '')[:500],
+            round(doc.size / (1024 * 1024), 2) if doc.size else 0,
+            f'{url_prefix}{message.id}' if url_prefix else str(message.id),
+        )
+
+    def _get_sender_name(self, message, users):
+        """Resolve a raw message's sender name, cached per sender id."""
+        from_id = getattr(message, 'from_id', None)
+        if from_id is None or from_id.__class__ is not PeerUser:
             return 'Unknown'
-        
-        if hasattr(message.sender, 'first_name'):
-            if hasattr(message.sender, 'last_name') and message.sender.last_name:
-                return f"{message.sender.first_name} {message.sender.last_name}"
-            return message.sender.first_name
-        
-        if hasattr(message.sender, 'username') and message.sender.username:
-            return f"@{message.sender.username}"
-        
+
+        sender_id = from_id.user_id
+        name = self._sender_cache.get(sender_id)
+        if name is None:
+            name = self._compute_sender_name(users.get(sender_id))
+            self._sender_cache[sender_id] = name
+        return name
+
+    @staticmethod
+    def _compute_sender_name(sender):
+        """Build a display name from a sender entity."""
+        if not sender:
+            return 'Unknown'
+
+        if hasattr(sender, 'first_name'):
+            if hasattr(sender, 'last_name') and sender.last_name:
+                return f"{sender.first_name} {sender.last_name}"
+            return sender.first_name
+
+        if hasattr(sender, 'username') and sender.username:
+            return f"@{sender.username}"
+
         return 'Unknown'
     
-    def export_csv(self, output_path='scraped_files.csv'):
-        """Export results to CSV."""
-        if not self.files:
-            print("⚠️  No files to export")
-            return
-        
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            fieldnames = ['filename', 'message_id', 'date', 'sender', 'caption', 'file_size_mb', 'message_url']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            writer.writerows(self.files)
-        
-        print(f"\n📊 Exported to: {os.path.abspath(output_path)}")
-    
-    def export_json(self, output_path='scraped_files.json'):
-        """Export results to JSON."""
-        if not self.files:
-            print("⚠️  No files to export")
-            return
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(self.files, f, indent=2, ensure_ascii=False)
-        
-        print(f"📊 Exported to: {os.path.abspath(output_path)}")
-    
     def print_summary(self):
         """Print summary of scraped files."""
-        if not self.files:
+        if not self._total_files:
             return
-        
+
         print("\n" + "="*60)
         print("SUMMARY")
         print("="*60)
-        
-        # Count by extension
-        extensions = {}
-        total_size = 0
-        
-        for f in self.files:
-            ext = os.path.splitext(f['filename'])[1].lower()
-            extensions[ext] = extensions.get(ext, 0) + 1
-            total_size += f['file_size_mb']
-        
-        print(f"\nTotal Files: {len(self.files)}")
-        print(f"Total Size: {round(total_size, 2)} MB")
-        
+
+        print(f"\nTotal Files: {self._total_files}")
+        print(f"Total Size: {round(self._total_size, 2)} MB")
+
         print("\nBy Extension:")
-        for ext, count in sorted(extensions.items(), key=lambda x: x[1], reverse=True)[:10]:
+        for ext, count in self._ext_counts.most_common(10):
             print(f"  {ext or 'no extension'}: {count}")
-        
-        # Top 10 largest
+
         print("\nTop 10 Largest Files:")
-        sorted_files = sorted(self.files, key=lambda x: x['file_size_mb'], reverse=True)[:10]
-        for i, f in enumerate(sorted_files, 1):
-            print(f"  {i}. {f['filename']} ({f['file_size_mb']} MB)")
-        
+        for i, (size, name) in enumerate(sorted(self._largest, reverse=True), 1):
+            print(f"  {i}. {name} ({size} MB)")
+
         print("\n" + "="*60)
     
     async def close(self):
         """Disconnect from Telegram."""
+        self._save_entity_cache()
         await self.client.disconnect()
         print("\n👋 Disconnected")
 
@@ -225,8 +553,8 @@ Examples:
         """
     )
     
-    parser.add_argument('--group', '-g', required=True, 
-                        help='Group username, ID, or URL (e.g., mtforexeafree)')
+    parser.add_argument('--group', '-g', required=True, nargs='+',
+                        help='Group username(s), ID(s), or URL(s) (e.g., mtforexeafree)')
     parser.add_argument('--limit', '-l', type=int, default=10000,
                         help='Max messages to scan (default: 10000)')
     parser.add_argument('--output', '-o', default='scraped_files.csv',
@@ -234,7 +562,9 @@ Examples:
     parser.add_argument('--types', '-t', nargs='+', default=None,
                         help='File types to filter (e.g., .ex4 .ex5 .zip)')
     parser.add_argument('--json', action='store_true',
-                        help='Also export to JSON format')
+                        help='Also export to JSON Lines format (one object per line)')
+    parser.add_argument('--compress', action='store_true',
+                        help='Compress output with zstd (appends .zst; requires zstandard)')
     
     args = parser.parse_args()
     
@@ -243,15 +573,15 @@ Examples:
     print("="*60)
     
     try:
-        scraper = TelegramFileScraper()
+        output_path = args.output
+        json_path = output_path.replace('.csv', '.jsonl') if args.json else None
+        if args.compress:
+            output_path += '.zst'
+            if json_path:
+                json_path += '.zst'
+        scraper = TelegramFileScraper(output_path=output_path, json_path=json_path)
         await scraper.connect()
-        await scraper.scrape_group(args.group, args.limit, args.types)
-        scraper.export_csv(args.output)
-        
-        if args.json:
-            scraper.export_json(args.output.replace('.csv', '.json'))
-        
-        scraper.print_summary()
+        await scraper.scrape_groups(args.group, args.limit, args.types)
         
     except Exception as e:
         print(f"\n❌ Error: {e}")